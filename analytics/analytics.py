@@ -0,0 +1,251 @@
+import os
+from datetime import datetime
+from itertools import chain
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from models import (
+    db, SEAT_CLASSES, TrainInfo, TrainStatus, ReservedTicket, CanceledTicket,
+    ReservedTicketArchive, CanceledTicketArchive
+)
+from analytics.reports import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, REPORTS, REPORTS_DIR, export_path
+
+#----------------------------------------------------------------------------#
+# Configuration
+#----------------------------------------------------------------------------#
+# Booking lead time histogram edges, in days before travel
+LEAD_TIME_BINS = np.array([0, 1, 3, 7, 14, 30, 60, 90, 180, 365])
+LEAD_TIME_LABELS = [
+    f'{lo}-{hi - 1}' if hi - lo > 1 else str(lo)
+    for lo, hi in zip(LEAD_TIME_BINS[:-1], LEAD_TIME_BINS[1:])
+] + [f'{LEAD_TIME_BINS[-1]}+']
+
+KEYS = ['train_number', 'ticket_category']
+# Report name -> column the per-(train, class) aggregates are rolled up by
+GRAINS = {'train': 'train_number', 'route': 'route', 'class': 'ticket_category'}
+
+
+#----------------------------------------------------------------------------#
+# Streaming
+#----------------------------------------------------------------------------#
+def iter_frames(stmt, chunk_size=DEFAULT_CHUNK_SIZE, bind=None):
+    """Yield the rows of ``stmt`` as DataFrames of at most ``chunk_size`` rows.
+
+    Uses a server-side cursor on PostgreSQL so the full result set is never
+    materialized on the client.
+    """
+    bind = bind if bind is not None else db.session
+    result = bind.execute(stmt.execution_options(stream_results=True))
+    columns = list(result.keys())
+    for rows in result.partitions(chunk_size):
+        yield pd.DataFrame.from_records(rows, columns=columns)
+
+
+def _accumulate(total, part):
+    if total is None:
+        return part
+    return total.add(part, fill_value=0)
+
+
+#----------------------------------------------------------------------------#
+# Aggregation
+#----------------------------------------------------------------------------#
+def train_frame(bind=None):
+    """Route and fare columns for every train, indexed by train number."""
+    bind = bind if bind is not None else db.session
+    columns = [
+        TrainInfo.train_number, TrainInfo.departure_city, TrainInfo.arrival_city
+    ] + [getattr(TrainInfo, fare) for _, _, fare in SEAT_CLASSES.values()]
+    rows = bind.execute(select(*columns)).all()
+    frame = pd.DataFrame.from_records(rows, columns=[c.key for c in columns])
+    frame['route'] = frame['departure_city'] + ' -> ' + frame['arrival_city']
+    return frame.set_index('train_number')
+
+
+def seat_totals(chunk_size=DEFAULT_CHUNK_SIZE, bind=None):
+    """Total and booked seats per (train, class) summed over all travel dates."""
+    seat_columns = [c for total, booked, _ in SEAT_CLASSES.values() for c in (total, booked)]
+    stmt = select(TrainStatus.train_number, *[getattr(TrainStatus, c) for c in seat_columns])
+
+    totals = None
+    for chunk in iter_frames(stmt, chunk_size, bind):
+        summed = chunk.groupby('train_number')[seat_columns].sum()
+        # Reshape the wide per-class columns into one (train, class) row each
+        parts = []
+        for category, (total, booked, _) in SEAT_CLASSES.items():
+            part = summed[[total, booked]].rename(columns={total: 'total_seats', booked: 'booked_seats'})
+            part['ticket_category'] = category
+            parts.append(part)
+        part = pd.concat(parts).reset_index().set_index(KEYS)
+        totals = _accumulate(totals, part)
+    return totals
+
+
+def ticket_counts(chunk_size=DEFAULT_CHUNK_SIZE, bind=None, with_lead_time=True):
+    """Booking and confirmed counts per (train, class), plus the lead time
+    histogram per class (None unless ``with_lead_time``)."""
+    # Archived tickets are still part of the history being reported on
+    reserved = chain.from_iterable(
+        iter_frames(select(
+            model.train_number,
+            model.ticket_category,
+            model.ticket_status,
+            model.booking_date,
+            model.travel_date,
+        ), chunk_size, bind)
+        for model in (ReservedTicket, ReservedTicketArchive)
+    )
+
+    counts = None
+    lead_time = None
+    for chunk in reserved:
+        chunk['confirmed'] = (chunk['ticket_status'] == 'confirmed').astype(np.int64)
+        grouped = chunk.groupby(KEYS)['confirmed'].agg(['size', 'sum'])
+        grouped.columns = ['bookings', 'confirmed']
+        counts = _accumulate(counts, grouped)
+        if not with_lead_time:
+            continue
+
+        booked_on = pd.to_datetime(chunk['booking_date'], utc=True).dt.tz_localize(None).dt.normalize()
+        travel_on = pd.to_datetime(chunk['travel_date'])
+        days = (travel_on - booked_on).dt.days.to_numpy()
+        valid = ~np.isnan(days) & (days >= 0)
+        days = days[valid].astype(np.int64)
+        buckets = np.digitize(days, LEAD_TIME_BINS[1:])
+        part = pd.DataFrame({
+            'ticket_category': chunk['ticket_category'].to_numpy()[valid],
+            'bucket': buckets,
+            'days': days,
+        }).groupby(['ticket_category', 'bucket'])['days'].agg(['size', 'sum'])
+        part.columns = ['tickets', 'total_days']
+        lead_time = _accumulate(lead_time, part)
+
+    if counts is None:
+        counts = pd.DataFrame(columns=['bookings', 'confirmed'], index=pd.MultiIndex.from_tuples([], names=KEYS))
+    return counts, lead_time
+
+
+def canceled_counts(chunk_size=DEFAULT_CHUNK_SIZE, bind=None):
+    """Canceled ticket counts per (train, class)."""
+    canceled_rows = chain.from_iterable(
+        iter_frames(select(model.train_number, model.ticket_category), chunk_size, bind)
+        for model in (CanceledTicket, CanceledTicketArchive)
+    )
+    canceled = None
+    for chunk in canceled_rows:
+        canceled = _accumulate(canceled, chunk.groupby(KEYS).size().to_frame('canceled'))
+
+    if canceled is None:
+        canceled = pd.DataFrame(columns=['canceled'], index=pd.MultiIndex.from_tuples([], names=KEYS))
+    return canceled
+
+
+def _rates(frame):
+    frame = frame.copy()
+    frame['load_factor'] = frame['booked_seats'] / frame['total_seats'].where(frame['total_seats'] > 0)
+    frame['cancellation_rate'] = frame['canceled'] / frame['bookings'].where(frame['bookings'] > 0)
+    return frame
+
+
+def _lead_time_report(lead_time):
+    columns = ['ticket_category', 'lead_time_days', 'tickets', 'share', 'mean_days']
+    if lead_time is None or lead_time.empty:
+        return pd.DataFrame(columns=columns)
+    frame = lead_time.astype(np.int64).reset_index()
+    frame['lead_time_days'] = np.asarray(LEAD_TIME_LABELS, dtype=object)[frame['bucket'].to_numpy()]
+    per_class = frame.groupby('ticket_category')[['tickets', 'total_days']].transform('sum')
+    frame['share'] = frame['tickets'] / per_class['tickets']
+    frame['mean_days'] = per_class['total_days'] / per_class['tickets']
+    return frame.sort_values(['ticket_category', 'bucket'])[columns].reset_index(drop=True)
+
+
+def build_reports(names=REPORTS, chunk_size=DEFAULT_CHUNK_SIZE, bind=None):
+    """Compute the requested occupancy and revenue reports.
+
+    Returns a dict of DataFrames keyed by report name: ``train``, ``route``
+    and ``class`` hold load factors, revenue and cancellation rates at that
+    grain, ``lead_time`` holds the booking lead time distribution per class.
+    Only the scans the requested reports need are run.
+    """
+    unknown = set(names) - set(REPORTS)
+    if unknown:
+        raise ValueError(f'Unknown reports: {", ".join(sorted(unknown))}')
+
+    counts, lead_time = ticket_counts(chunk_size, bind, with_lead_time='lead_time' in names)
+    reports = {}
+    if 'lead_time' in names:
+        reports['lead_time'] = _lead_time_report(lead_time)
+    grains = [name for name in names if name in GRAINS]
+    if not grains:
+        return reports
+
+    trains = train_frame(bind)
+    seats = seat_totals(chunk_size, bind)
+    counts = counts.join(canceled_counts(chunk_size, bind), how='outer')
+
+    base = pd.DataFrame(index=pd.MultiIndex.from_tuples([], names=KEYS))
+    for part in (seats, counts):
+        if part is not None:
+            base = base.join(part, how='outer')
+    metrics = ['total_seats', 'booked_seats', 'bookings', 'confirmed', 'canceled']
+    base = base.reindex(columns=metrics).fillna(0).astype(np.int64).reset_index()
+
+    # Revenue is earned by confirmed tickets at the train's fare for that class.
+    # Fares are nullable, so cast before stacking to keep the column numeric.
+    fares = trains[[fare for _, _, fare in SEAT_CLASSES.values()]].apply(pd.to_numeric).astype(np.float64)
+    fares.columns = list(SEAT_CLASSES)
+    fares = fares.stack().rename('fare').reset_index()
+    fares.columns = KEYS + ['fare']
+    base = base.merge(fares, on=KEYS, how='left')
+    base['revenue'] = (base['confirmed'] * base['fare'].fillna(0)).astype(np.float64)
+    base = base.merge(trains[['route']], left_on='train_number', right_index=True, how='left')
+    metrics.append('revenue')
+
+    for name in grains:
+        reports[name] = _rates(base.groupby(GRAINS[name])[metrics].sum()).reset_index()
+    return reports
+
+
+#----------------------------------------------------------------------------#
+# Export
+#----------------------------------------------------------------------------#
+def write_report(frame, target, fmt='csv'):
+    """Write a report to a path or file object in csv, parquet or feather (Arrow IPC)."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Unsupported export format: {fmt}')
+    if fmt == 'csv':
+        frame.to_csv(target, index=False)
+    elif fmt == 'parquet':
+        frame.to_parquet(target, index=False)
+    else:
+        frame.to_feather(target)
+
+
+def read_report(path, fmt):
+    if fmt == 'csv':
+        return pd.read_csv(path)
+    if fmt == 'parquet':
+        return pd.read_parquet(path)
+    return pd.read_feather(path)
+
+
+def exported_report(name, directory=REPORTS_DIR):
+    """The last export of report ``name``, or None if it was never exported.
+
+    Returns a dict with the ``frame`` (read from the most recently written format),
+    the ``formats`` on disk mapped to their paths, and when it was ``generated``.
+    """
+    formats = {}
+    for fmt in EXPORT_FORMATS:
+        path = export_path(name, fmt, directory)
+        if path:
+            formats[fmt] = path
+    if not formats:
+        return None
+    fmt, path = max(formats.items(), key=lambda item: os.path.getmtime(item[1]))
+    return {
+        'frame': read_report(path, fmt),
+        'formats': formats,
+        'generated': datetime.fromtimestamp(os.path.getmtime(path)),
+    }
+
@@ -0,0 +1,58 @@
+import os
+import click
+from flask.cli import AppGroup
+
+# Report names, export formats and locations, and the export CLI. app.py
+# imports this module, so it must not import numpy or pandas: those only
+# load in the `flask analytics export` process and on the admin page.
+
+#----------------------------------------------------------------------------#
+# Configuration
+#----------------------------------------------------------------------------#
+# Rows fetched per round trip. Every chunk is reduced to per-(train, class)
+# aggregates before the next one is read, so memory stays bounded by the
+# number of distinct trains, not by the number of tickets.
+DEFAULT_CHUNK_SIZE = int(os.environ.get('ANALYTICS_CHUNK_SIZE', 50000))
+
+EXPORT_FORMATS = ('csv', 'parquet', 'feather')
+REPORTS = ('train', 'route', 'class', 'lead_time')
+
+# Where `flask analytics export` writes and the admin page reads the reports.
+# Computing them scans all ticket history, so it never happens in a request.
+REPORTS_DIR = os.environ.get(
+    'ANALYTICS_REPORTS_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'reports')
+)
+
+
+def export_path(name, fmt, directory=REPORTS_DIR):
+    """Path of the exported file for report ``name`` in ``fmt``, if it exists."""
+    path = os.path.join(directory, f'{name}.{fmt}')
+    return path if os.path.isfile(path) else None
+
+
+#----------------------------------------------------------------------------#
+# CLI
+#----------------------------------------------------------------------------#
+analytics_cli = AppGroup('analytics', help='Occupancy and revenue reports.')
+
+
+@analytics_cli.command('export')
+@click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default='csv')
+@click.option('--report', 'names', type=click.Choice(REPORTS), multiple=True,
+              help='Report to compute; repeatable. Defaults to all of them.')
+@click.option('--out', 'out_dir', default=REPORTS_DIR, show_default=True, help='Output directory.')
+@click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True, help='Rows fetched per chunk.')
+def export_command(fmt, names, out_dir, chunk_size):
+    """Compute the reports and write one file per report."""
+    from analytics.analytics import build_reports, write_report
+
+    os.makedirs(out_dir, exist_ok=True)
+    reports = build_reports(names or REPORTS, chunk_size=chunk_size)
+    for name, frame in reports.items():
+        # Write then rename, so the admin page never reads a half-written file
+        path = os.path.join(out_dir, f'{name}.{fmt}')
+        partial = f'{path}.partial'
+        write_report(frame, partial, fmt)
+        os.replace(partial, path)
+        click.echo(f'{path}: {len(frame)} rows')
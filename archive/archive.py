@@ -0,0 +1,115 @@
+import os
+from datetime import date, datetime, timedelta
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, delete, func, literal, text
+from models import db, ReservedTicket, CanceledTicket, ReservedTicketArchive, CanceledTicketArchive
+
+#----------------------------------------------------------------------------#
+# Configuration
+#----------------------------------------------------------------------------#
+# Tickets stay in the hot tables until this many days after travel
+DEFAULT_RETENTION_DAYS = int(os.environ.get('ARCHIVE_RETENTION_DAYS', 30))
+# Tickets moved per transaction
+DEFAULT_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 10000))
+
+# Hot table -> cold table
+ARCHIVES = (
+    (CanceledTicket, CanceledTicketArchive),
+    (ReservedTicket, ReservedTicketArchive),
+)
+
+
+#----------------------------------------------------------------------------#
+# Partitions
+#----------------------------------------------------------------------------#
+def ensure_partitions(first_year, last_year):
+    """Create the yearly travel_date partitions of the archive tables.
+
+    Only PostgreSQL declares the archive tables as partitioned; elsewhere
+    they are plain tables and this is a no-op.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for _, archive in ARCHIVES:
+        table = archive.__tablename__
+        for year in range(first_year, last_year + 1):
+            db.session.execute(text(
+                f'CREATE TABLE IF NOT EXISTS {table}_{year} PARTITION OF {table} '
+                f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            ))
+    db.session.commit()
+
+
+#----------------------------------------------------------------------------#
+# Archival
+#----------------------------------------------------------------------------#
+def _move(hot, cold, ticket_ids, archived_date):
+    # Copy the rows across, then drop them from the hot table
+    table = hot.__table__
+    columns = [c.name for c in table.columns]
+    # travel_date is part of the archive key but nullable on canceled_ticket,
+    # so always take it from the reserved ticket
+    values = [
+        ReservedTicket.__table__.c.travel_date if name == 'travel_date' else table.c[name]
+        for name in columns
+    ]
+    rows = select(*values, literal(archived_date)).select_from(table)
+    if hot is not ReservedTicket:
+        rows = rows.join(ReservedTicket.__table__, ReservedTicket.__table__.c.ticket_id == table.c.ticket_id)
+    rows = rows.where(table.c.ticket_id.in_(ticket_ids))
+    db.session.execute(
+        cold.__table__.insert().from_select(columns + ['archived_date'], rows, include_defaults=False)
+    )
+    db.session.execute(
+        delete(table).where(table.c.ticket_id.in_(ticket_ids))
+    )
+
+
+def archive_tickets(retention_days=DEFAULT_RETENTION_DAYS, batch_size=DEFAULT_BATCH_SIZE, today=None):
+    """Move tickets that travelled more than ``retention_days`` ago to the
+    archive tables. Returns the number of reserved tickets archived."""
+    cutoff = (today or date.today()) - timedelta(days=retention_days)
+
+    oldest = db.session.execute(
+        select(func.min(ReservedTicket.travel_date)).where(ReservedTicket.travel_date < cutoff)
+    ).scalar()
+    if oldest is None:
+        return 0
+    ensure_partitions(oldest.year, cutoff.year)
+
+    archived = 0
+    while True:
+        ticket_ids = db.session.execute(
+            select(ReservedTicket.ticket_id)
+            .where(ReservedTicket.travel_date < cutoff)
+            .order_by(ReservedTicket.travel_date)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ticket_ids:
+            break
+        try:
+            archived_date = datetime.utcnow()
+            # Cancellations first, they reference reserved_ticket
+            for hot, cold in ARCHIVES:
+                _move(hot, cold, ticket_ids, archived_date)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        archived += len(ticket_ids)
+    return archived
+
+
+tickets_cli = AppGroup('tickets', help='Ticket table maintenance.')
+
+
+@tickets_cli.command('archive')
+@click.option('--retention-days', default=DEFAULT_RETENTION_DAYS, show_default=True,
+              help='Days after travel before a ticket is archived.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True,
+              help='Tickets moved per transaction.')
+def archive_command(retention_days, batch_size):
+    """Move past-date tickets to the archive tables."""
+    archived = archive_tickets(retention_days, batch_size)
+    click.echo(f'Archived {archived} tickets')
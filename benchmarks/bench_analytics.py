@@ -0,0 +1,117 @@
+"""Benchmark the chunked analytics reports against an ORM row-by-row loop.
+
+Builds a throwaway in-memory SQLite database with synthetic trains and tickets, then
+reports wall time and peak Python heap for both approaches:
+
+    python benchmarks/bench_analytics.py --tickets 1000000 --chunk-size 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from models import db, SEAT_CLASSES, User, Passenger, TrainInfo, TrainStatus, ReservedTicket, CanceledTicket
+from analytics.analytics import build_reports
+
+
+def populate(trains, days, tickets):
+    rng = random.Random(0)
+    start = date(2024, 1, 1)
+    db.session.add(User(user_id=1, user_name='bench', user_password='bench'))
+    db.session.add(Passenger(passenger_id=1, user_id=1, passenger_name='bench'))
+    cities = ['Lahore', 'Karachi', 'Islamabad', 'Multan', 'Quetta', 'Peshawar']
+    db.session.bulk_insert_mappings(TrainInfo, [
+        dict(train_number=f'T{t}', train_name=f'Train {t}',
+             departure_city=cities[t % len(cities)], arrival_city=cities[(t + 1) % len(cities)],
+             **{fare: 1000 * (i + 1) for i, (_, _, fare) in enumerate(SEAT_CLASSES.values())})
+        for t in range(trains)
+    ])
+    db.session.bulk_insert_mappings(TrainStatus, [
+        dict(train_number=f'T{t}', travel_date=start + timedelta(days=d),
+             **{total: 200 for total, _, _ in SEAT_CLASSES.values()},
+             **{booked: rng.randint(0, 200) for _, booked, _ in SEAT_CLASSES.values()})
+        for t in range(trains) for d in range(days)
+    ])
+    categories = list(SEAT_CLASSES)
+    batch = []
+    canceled = []
+    for ticket_id in range(1, tickets + 1):
+        travel_date = start + timedelta(days=rng.randrange(days))
+        category = categories[rng.randrange(len(categories))]
+        status = 'canceled' if rng.random() < 0.1 else 'confirmed'
+        row = dict(ticket_id=ticket_id, user_id=1, passenger_id=1,
+                   train_number=f'T{rng.randrange(trains)}', ticket_category=category,
+                   travel_date=travel_date, ticket_status=status,
+                   booking_date=datetime.combine(travel_date, datetime.min.time()) - timedelta(days=rng.randrange(120)))
+        batch.append(row)
+        if status == 'canceled':
+            canceled.append({k: row[k] for k in ('ticket_id', 'user_id', 'passenger_id', 'train_number',
+                                                 'ticket_category', 'travel_date', 'booking_date')})
+        if len(batch) >= 50000:
+            db.session.bulk_insert_mappings(ReservedTicket, batch)
+            db.session.bulk_insert_mappings(CanceledTicket, canceled)
+            batch, canceled = [], []
+    db.session.bulk_insert_mappings(ReservedTicket, batch)
+    db.session.bulk_insert_mappings(CanceledTicket, canceled)
+    db.session.commit()
+
+
+def orm_baseline():
+    # What the admin pages do today: load every row as an ORM object
+    fares = {t.train_number: t for t in TrainInfo.query.all()}
+    load = {}
+    for status in TrainStatus.query.all():
+        for category, (total, booked, _) in SEAT_CLASSES.items():
+            seats = load.setdefault((status.train_number, category), [0, 0])
+            seats[0] += getattr(status, total) or 0
+            seats[1] += getattr(status, booked) or 0
+    revenue = {}
+    for ticket in ReservedTicket.query.all():
+        if ticket.ticket_status == 'confirmed':
+            fare = getattr(fares[ticket.train_number], SEAT_CLASSES[ticket.ticket_category][2]) or 0
+            revenue[ticket.train_number] = revenue.get(ticket.train_number, 0) + fare
+    return load, revenue
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<12} {elapsed:8.2f}s  peak {peak / 2**20:8.1f} MiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--trains', type=int, default=50)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--tickets', type=int, default=500000)
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--skip-orm', action='store_true', help='Only time the chunked reports.')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        print(f'Populating {args.trains} trains x {args.days} days, {args.tickets} tickets...')
+        populate(args.trains, args.days, args.tickets)
+
+        measure('analytics', lambda: build_reports(chunk_size=args.chunk_size))
+        if not args.skip_orm:
+            db.session.expunge_all()
+            measure('orm loop', orm_baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Compare sync and gevent gunicorn workers under concurrent load.
+
+Starts gunicorn once per worker class with gunicorn.conf.py, drives a read
+path with N concurrent clients, and reports requests/sec, median latency and
+resident memory of the workers per concurrent client:
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_workers.py --concurrency 100 --workers 2
+
+Run it against a non-production database; the default path, the home page,
+only reads TrainInfo. Linux only (worker memory is read from /proc).
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_for_port(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn did not start listening on port {port}')
+
+
+def worker_rss(master_pid):
+    # Sum VmRSS of the master's children (the workers), in bytes
+    total = 0
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+        children = f.read().split()
+    for pid in children:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    total += int(line.split()[1]) * 1024
+    return total
+
+
+def drive(url, concurrency, duration):
+    deadline = time.monotonic() + duration
+
+    def client():
+        latencies, errors = [], 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+        return latencies, errors
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: client(), range(concurrency)))
+    latencies = [latency for result in results for latency in result[0]]
+    errors = sum(result[1] for result in results)
+    return latencies, errors
+
+
+def run(worker_class, args):
+    env = dict(os.environ,
+               PORT=str(args.port),
+               WEB_CONCURRENCY=str(args.workers),
+               GUNICORN_WORKER_CLASS=worker_class)
+    master = subprocess.Popen(
+        ['gunicorn', '-c', 'gunicorn.conf.py', args.app],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(args.port)
+        url = f'http://127.0.0.1:{args.port}{args.path}'
+        drive(url, min(args.concurrency, 4), 2)  # warm up
+        latencies, errors = drive(url, args.concurrency, args.duration)
+        rss = worker_rss(master.pid)
+    finally:
+        master.terminate()
+        master.wait()
+
+    rps = len(latencies) / args.duration
+    median = statistics.median(latencies) * 1000 if latencies else float('nan')
+    print(f'{worker_class:<8} {rps:10.1f} req/s  p50 {median:8.1f} ms  errors {errors:5d}  '
+          f'workers {rss / 2**20:7.1f} MiB  {rss / args.concurrency / 2**10:7.1f} KiB/client')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--app', default='app:app')
+    parser.add_argument('--path', default='/')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--duration', type=int, default=15, help='Seconds of load per worker class.')
+    parser.add_argument('--worker-class', action='append', choices=['sync', 'gevent'],
+                        help='Repeatable; defaults to both.')
+    args = parser.parse_args()
+
+    for worker_class in args.worker_class or ['sync', 'gevent']:
+        run(worker_class, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+import os
+
+#----------------------------------------------------------------------------#
+# Gunicorn configuration, loaded automatically from the working directory.
+#----------------------------------------------------------------------------#
+# GUNICORN_WORKER_CLASS=sync   one request at a time per worker (default)
+# GUNICORN_WORKER_CLASS=gevent many concurrent requests per worker; waits on
+#                              PostgreSQL, Azure Blob Storage and seat streams
+#                              yield to other requests instead of blocking
+#
+# Worker count comes from WEB_CONCURRENCY (gunicorn default: 1). Database
+# connections stay bounded by workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW), plus
+# one seat feed LISTEN connection (outside the pool) per gevent worker.
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+timeout = 600
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+# Concurrent requests per gevent worker; ignored by sync workers. Live seat
+# streams are capped per worker by SEAT_MAX_STREAMS (50), which must stay
+# below this so streams cannot take every connection.
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 100))
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        # psycopg2 is a C extension that gevent cannot monkey patch; this makes
+        # it wait on PostgreSQL through gevent so other greenlets keep running
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
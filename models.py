@@ -5,6 +5,16 @@ from sqlalchemy.orm import relationship
 
 db = SQLAlchemy()
 
+# Ticket category -> (TrainStatus total seats column, TrainStatus booked seats
+# column, TrainInfo fare column)
+SEAT_CLASSES = {
+    'economy': ('total_economy_seats', 'booked_economy_seats', 'economy_lare'),
+    'economy_birth': ('total_birth_seats', 'booked_birth_seats', 'economy_birth_lare'),
+    'ac_business': ('total_business_seats', 'booked_business_seats', 'ac_business_lare'),
+    'ac_standard': ('total_standard_seats', 'booked_standard_seats', 'ac_standard_lare'),
+    'ac_sleeper': ('total_sleeper_seats', 'booked_sleeper_seats', 'ac_sleeper_lare'),
+}
+
 def setup_db(app):
     db.init_app(app)
     with app.app_context():
@@ -108,6 +118,9 @@ class ReservedTicket(db.Model):
             ['train_number', 'travel_date'],
             ['train_status.train_number', 'train_status.travel_date']
         ),
+        # Dashboard lookups and the archival scan
+        db.Index('ix_reserved_ticket_user_status', 'user_id', 'ticket_status'),
+        db.Index('ix_reserved_ticket_travel_date', 'travel_date'),
     )
 
 class CanceledTicket(db.Model):
@@ -128,3 +141,51 @@ class CanceledTicket(db.Model):
 
     # ❌ REMOVE this line:
     # user = db.relationship('User', backref='canceled_tickets')
+
+#----------------------------------------------------------------------------#
+# Archive tables
+#----------------------------------------------------------------------------#
+# Tickets whose travel date has passed are moved here by `flask tickets archive`
+# so reserved_ticket and canceled_ticket only hold upcoming and recent trips.
+# On PostgreSQL both tables are range partitioned by travel_date with one
+# partition per year (created on demand by the archive job), which is why
+# travel_date is part of the primary key. Other databases get a plain table.
+
+class ReservedTicketArchive(db.Model):
+    __tablename__ = 'reserved_ticket_archive'
+
+    ticket_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    travel_date = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user_registration.user_id'), nullable=False)
+    passenger_id = db.Column(db.Integer, db.ForeignKey('passenger_info.passenger_id'), nullable=False)
+    train_number = db.Column(db.String(10), db.ForeignKey('train_info.train_number'), nullable=False)
+    booking_date = db.Column(db.TIMESTAMP(timezone=True))
+    ticket_status = db.Column(db.String(20))
+    ticket_category = db.Column(db.String(20), nullable=False)
+    archived_date = db.Column(db.TIMESTAMP(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        db.ForeignKeyConstraint(
+            ['train_number', 'travel_date'],
+            ['train_status.train_number', 'train_status.travel_date']
+        ),
+        db.Index('ix_reserved_ticket_archive_user', 'user_id'),
+        {'postgresql_partition_by': 'RANGE (travel_date)'},
+    )
+
+class CanceledTicketArchive(db.Model):
+    __tablename__ = 'canceled_ticket_archive'
+
+    ticket_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    travel_date = db.Column(db.Date, primary_key=True)
+    booking_date = db.Column(db.TIMESTAMP(timezone=True))
+    cancellation_date = db.Column(db.TIMESTAMP(timezone=True))
+    user_id = db.Column(db.Integer, db.ForeignKey('user_registration.user_id'))
+    passenger_id = db.Column(db.Integer, db.ForeignKey('passenger_info.passenger_id'))
+    train_number = db.Column(db.String(10), db.ForeignKey('train_info.train_number'))
+    ticket_category = db.Column(db.String(20))
+    archived_date = db.Column(db.TIMESTAMP(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        {'postgresql_partition_by': 'RANGE (travel_date)'},
+    )
@@ -0,0 +1,215 @@
+import json
+import os
+import queue
+import select as select_io
+import sys
+import threading
+import time
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.pool import NullPool
+from models import db, SEAT_CLASSES
+
+#----------------------------------------------------------------------------#
+# Configuration
+#----------------------------------------------------------------------------#
+# PostgreSQL LISTEN/NOTIFY channel carrying seat inventory changes
+CHANNEL = 'seat_inventory'
+# Seconds between keepalive comments on an idle stream
+KEEPALIVE_SECONDS = 15
+# Streams end after this long and the browser's EventSource reconnects
+STREAM_SECONDS = int(os.environ.get('SEAT_STREAM_SECONDS', 300))
+# (train_number, travel_date) pairs one page may watch over its single stream
+MAX_STREAM_KEYS = 20
+# Open streams per worker process. Each holds one of the gevent worker's
+# worker_connections for up to STREAM_SECONDS, so keep this well below
+# GUNICORN_WORKER_CONNECTIONS to leave room for ordinary page requests.
+MAX_STREAMS = int(os.environ.get('SEAT_MAX_STREAMS', 50))
+# Events buffered per subscriber. Every event carries the absolute seat
+# count, so a slow client that misses some only skips intermediate values.
+QUEUE_SIZE = 100
+
+_PENDING = 'pending_seat_events'
+
+
+def live_seats_enabled():
+    """Whether this process can serve seat streams.
+
+    An open stream holds a sync worker for its whole lifetime, so live seats
+    are only served by gevent workers (see gunicorn.conf.py). This checks
+    the worker actually running, i.e. that gevent has patched the socket
+    module, not the configured worker class.
+    """
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('socket')
+
+
+#----------------------------------------------------------------------------#
+# Fan-out
+#----------------------------------------------------------------------------#
+class Subscription:
+    def __init__(self, feed, keys):
+        self.feed = feed
+        self.keys = keys
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.closed = False
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.feed.unsubscribe(self)
+
+
+class SeatFeed:
+    """Per-process hub that hands each seat inventory change to every
+    subscriber of that (train_number, travel_date).
+
+    On PostgreSQL a single LISTEN connection per process receives the
+    notifications, however many clients are subscribed. Other databases
+    publish straight from the committing session instead.
+    """
+
+    def __init__(self, max_streams=MAX_STREAMS):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._listener = None
+        self._streams = threading.BoundedSemaphore(max_streams)
+
+    def subscribe(self, keys):
+        """Subscribe to changes of every (train_number, travel_date) in ``keys``.
+
+        Returns None when ``max_streams`` subscriptions are already open.
+        """
+        if not self._streams.acquire(blocking=False):
+            return None
+        subscription = Subscription(self, {(train_number, str(travel_date)) for train_number, travel_date in keys})
+        with self._lock:
+            for key in subscription.keys:
+                self._subscribers.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription.closed:
+                return
+            subscription.closed = True
+            self._streams.release()
+            for key in subscription.keys:
+                subscribers = self._subscribers.get(key, set())
+                subscribers.discard(subscription)
+                if not subscribers:
+                    self._subscribers.pop(key, None)
+
+    def publish(self, seat_event):
+        key = (seat_event['train_number'], seat_event['travel_date'])
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(seat_event)
+            except queue.Full:
+                pass
+
+    def start(self, engine):
+        """Start the LISTEN thread for this process, once, on PostgreSQL."""
+        if engine.dialect.name != 'postgresql':
+            return
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(target=self._listen, args=(engine,), daemon=True)
+            self._listener.start()
+
+    def _listen(self, engine):
+        # The LISTEN connection lives as long as the process, so it gets its
+        # own unpooled engine instead of permanently taking a request slot
+        listener_engine = create_engine(engine.url, poolclass=NullPool)
+        while True:
+            connection = None
+            try:
+                connection = listener_engine.raw_connection()
+                dbapi_connection = connection.connection
+                dbapi_connection.autocommit = True
+                cursor = dbapi_connection.cursor()
+                cursor.execute(f'LISTEN {CHANNEL}')
+                while True:
+                    if select_io.select([dbapi_connection], [], [], KEEPALIVE_SECONDS) == ([], [], []):
+                        # Quiet for a while; a dropped connection would stay
+                        # quiet forever, so check it is alive. If not this
+                        # raises and the listener reconnects below.
+                        cursor.execute('SELECT 1')
+                    else:
+                        dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        notify = dbapi_connection.notifies.pop(0)
+                        self.publish(json.loads(notify.payload))
+            except Exception as e:
+                print(f"Seat feed listener error: {str(e)}")
+                if connection is not None:
+                    connection.invalidate()
+                time.sleep(1)
+
+
+seat_feed = SeatFeed()
+
+
+#----------------------------------------------------------------------------#
+# Emitting changes
+#----------------------------------------------------------------------------#
+def record_seat_change(status, ticket_category):
+    """Announce the new seat count of ``ticket_category`` on ``status``.
+
+    Call after updating the booked count and before committing; subscribers
+    are only told once the transaction commits, and never if it rolls back.
+    """
+    if ticket_category not in SEAT_CLASSES:
+        return
+    total, booked, _ = SEAT_CLASSES[ticket_category]
+    seat_event = {
+        'train_number': status.train_number,
+        'travel_date': str(status.travel_date),
+        'ticket_category': ticket_category,
+        'available': (getattr(status, total) or 0) - (getattr(status, booked) or 0),
+    }
+    if db.engine.dialect.name == 'postgresql':
+        # NOTIFY is transactional: delivered on commit, dropped on rollback
+        db.session.execute(select(func.pg_notify(CHANNEL, json.dumps(seat_event))))
+    else:
+        db.session.info.setdefault(_PENDING, []).append(seat_event)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _publish_pending(session):
+    for seat_event in session.info.pop(_PENDING, []):
+        seat_feed.publish(seat_event)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_pending(session, previous_transaction):
+    session.info.pop(_PENDING, None)
+
+
+#----------------------------------------------------------------------------#
+# Server-sent events
+#----------------------------------------------------------------------------#
+def _sse(data):
+    return f'data: {json.dumps(data)}\n\n'
+
+
+def seat_stream(subscription, snapshots):
+    """SSE body: one snapshot message per (train, date), then one message per change."""
+    try:
+        for snapshot in snapshots:
+            yield _sse(snapshot)
+        deadline = time.monotonic() + STREAM_SECONDS
+        while time.monotonic() < deadline:
+            seat_event = subscription.get(timeout=KEEPALIVE_SECONDS)
+            if seat_event is None:
+                yield ': keepalive\n\n'
+            else:
+                yield _sse(seat_event)
+    finally:
+        subscription.close()
@@ -1,13 +1,13 @@
-#!/bin/bash
-
-# Activate the virtual environment
-source /antenv/bin/activate
-
-# Install any missing dependencies
-pip install -r requirements.txt
-
-# Run migrations if needed
-flask db upgrade
-
-# Start Gunicorn
-gunicorn --bind=0.0.0.0:${PORT:-8000} --timeout 600 app:app
+#!/bin/bash
+
+# Activate the virtual environment
+source /antenv/bin/activate
+
+# Install any missing dependencies
+pip install -r requirements.txt
+
+# Run migrations if needed
+flask db upgrade
+
+# Start Gunicorn (bind, timeout and worker class are set in gunicorn.conf.py)
+gunicorn -c gunicorn.conf.py app:app
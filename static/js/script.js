@@ -2,3 +2,37 @@ window.parseISOString = function parseISOString(s) {
   var b = s.split(/\D+/);
   return new Date(Date.UTC(b[0], --b[1], b[2], b[3], b[4], b[5], b[6]));
 };
+
+// Live seat counts: an element with data-seat-stream="<url>" opens one
+// server-sent event stream for the page. Each message names a train and date,
+// and updates the [data-seat-category] elements inside the matching
+// data-seat-key="<train_number>|<travel_date>" element.
+document.addEventListener('DOMContentLoaded', function () {
+  if (!window.EventSource) {
+    return;
+  }
+  document.querySelectorAll('[data-seat-stream]').forEach(function (root) {
+    var setSeats = function (key, category, available) {
+      root.parentNode.querySelectorAll('[data-seat-key]').forEach(function (card) {
+        if (card.getAttribute('data-seat-key') !== key) {
+          return;
+        }
+        card.querySelectorAll('[data-seat-category="' + category + '"]').forEach(function (el) {
+          el.textContent = available;
+        });
+      });
+    };
+    var source = new EventSource(root.getAttribute('data-seat-stream'));
+    source.onmessage = function (message) {
+      var data = JSON.parse(message.data);
+      var key = data.train_number + '|' + data.travel_date;
+      if (data.seats) {
+        Object.keys(data.seats).forEach(function (category) {
+          setSeats(key, category, data.seats[category]);
+        });
+      } else {
+        setSeats(key, data.ticket_category, data.available);
+      }
+    };
+  });
+});
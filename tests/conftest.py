@@ -0,0 +1,55 @@
+from datetime import date
+import pytest
+from flask import Flask
+from models import db, User, Passenger, TrainInfo, TrainStatus, ReservedTicket, CanceledTicket
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def train(app):
+    """Train T1 with 10 economy seats on 2024-01-05 and 2024-03-01."""
+    db.session.add(User(user_id=1, user_name='traveller', user_password='secret'))
+    db.session.add(Passenger(passenger_id=1, user_id=1, passenger_name='Traveller'))
+    db.session.add(TrainInfo(train_number='T1', train_name='Express',
+                             departure_city='Lahore', arrival_city='Karachi', economy_lare=1000))
+    for travel_date in (date(2024, 1, 5), date(2024, 3, 1)):
+        db.session.add(TrainStatus(train_number='T1', travel_date=travel_date,
+                                   total_economy_seats=10, booked_economy_seats=0))
+    db.session.commit()
+    return 'T1'
+
+
+@pytest.fixture
+def book(app):
+    """Factory adding a reserved ticket for passenger 1."""
+    def book(train_number, travel_date, ticket_category='economy', ticket_status='confirmed', booking_date=None):
+        ticket = ReservedTicket(user_id=1, passenger_id=1, train_number=train_number,
+                                ticket_category=ticket_category, travel_date=travel_date,
+                                ticket_status=ticket_status, booking_date=booking_date)
+        db.session.add(ticket)
+        db.session.flush()
+        return ticket
+    return book
+
+
+@pytest.fixture
+def cancel(app):
+    """Factory canceling a ticket the way cancel_booking does."""
+    def cancel(ticket, travel_date=None):
+        ticket.ticket_status = 'canceled'
+        db.session.add(CanceledTicket(ticket_id=ticket.ticket_id, user_id=ticket.user_id,
+                                      passenger_id=ticket.passenger_id, train_number=ticket.train_number,
+                                      ticket_category=ticket.ticket_category, travel_date=travel_date))
+    return cancel
@@ -0,0 +1,109 @@
+import os
+from datetime import date, datetime
+import pandas as pd
+import pytest
+from models import db, TrainInfo, TrainStatus
+from analytics.analytics import build_reports, write_report, read_report, exported_report, EXPORT_FORMATS
+from archive.archive import archive_tickets
+
+JANUARY = date(2024, 1, 5)
+MARCH = date(2024, 3, 1)
+
+
+@pytest.fixture
+def bookings(train, book, cancel):
+    """Four economy bookings on T1, one of them canceled, and 5 of 20 seats booked."""
+    TrainStatus.query.filter_by(travel_date=JANUARY).one().booked_economy_seats = 5
+    book(train, JANUARY, booking_date=datetime(2024, 1, 5, 9))
+    book(train, JANUARY, booking_date=datetime(2024, 1, 1, 9))
+    book(train, MARCH, booking_date=datetime(2024, 1, 20, 9))
+    cancel(book(train, MARCH, booking_date=datetime(2024, 2, 27, 9)), travel_date=MARCH)
+    db.session.commit()
+    return train
+
+
+def test_reports_on_known_rows(bookings):
+    reports = build_reports()
+
+    train = reports['train'].set_index('train_number').loc[bookings]
+    assert train['total_seats'] == 20
+    assert train['booked_seats'] == 5
+    assert train['load_factor'] == 0.25
+    assert train['bookings'] == 4
+    assert train['confirmed'] == 3
+    assert train['canceled'] == 1
+    assert train['cancellation_rate'] == 0.25
+    # Three confirmed tickets at the economy fare of 1000
+    assert train['revenue'] == 3000
+    assert reports['train']['revenue'].dtype == 'float64'
+    assert reports['route']['route'].tolist() == ['Lahore -> Karachi']
+    # Classes without seats or tickets still get a row, with no load factor
+    by_class = reports['class'].set_index('ticket_category')
+    assert by_class.loc['economy', 'revenue'] == 3000
+    assert pd.isna(by_class.loc['ac_sleeper', 'load_factor'])
+
+
+def test_revenue_stays_numeric_without_fares(bookings):
+    TrainInfo.query.update({'economy_lare': None})
+    db.session.commit()
+
+    train = build_reports(['train'])['train']
+
+    assert train['revenue'].dtype == 'float64'
+    assert train['revenue'].tolist() == [0.0]
+
+
+def test_lead_time_buckets(bookings):
+    lead_time = build_reports(['lead_time'])['lead_time']
+
+    # Booked 0, 4, 41 and 3 days before travel
+    assert lead_time[['ticket_category', 'lead_time_days', 'tickets']].values.tolist() == [
+        ['economy', '0', 1],
+        ['economy', '3-6', 2],
+        ['economy', '30-59', 1],
+    ]
+    assert lead_time['share'].sum() == pytest.approx(1)
+    assert lead_time['mean_days'].iloc[0] == pytest.approx(12)
+
+
+def test_reports_include_archived_tickets(bookings):
+    before = build_reports()
+
+    assert archive_tickets(retention_days=0, today=date(2024, 2, 1)) == 2
+
+    after = build_reports()
+    for name, frame in before.items():
+        pd.testing.assert_frame_equal(after[name], frame)
+
+
+def test_reports_on_empty_database(app):
+    reports = build_reports()
+
+    assert set(reports) == {'train', 'route', 'class', 'lead_time'}
+    for frame in reports.values():
+        assert frame.empty
+
+
+@pytest.mark.parametrize('fmt', EXPORT_FORMATS)
+def test_report_round_trip(bookings, tmp_path, fmt):
+    frame = build_reports(['train'])['train']
+    path = tmp_path / f'train.{fmt}'
+
+    write_report(frame, str(path), fmt)
+
+    pd.testing.assert_frame_equal(read_report(str(path), fmt), frame)
+
+
+def test_exported_report_reads_newest_format(bookings, tmp_path):
+    old = build_reports(['train'])['train']
+    write_report(old, str(tmp_path / 'train.parquet'), 'parquet')
+    new = old.assign(revenue=old['revenue'] * 2)
+    write_report(new, str(tmp_path / 'train.csv'), 'csv')
+    # Make the parquet file clearly older than the csv one
+    stale = (tmp_path / 'train.csv').stat().st_mtime - 60
+    os.utime(tmp_path / 'train.parquet', (stale, stale))
+
+    export = exported_report('train', str(tmp_path))
+
+    assert set(export['formats']) == {'csv', 'parquet'}
+    pd.testing.assert_frame_equal(export['frame'], new)
@@ -0,0 +1,40 @@
+from datetime import date
+from models import db, ReservedTicket, CanceledTicket, ReservedTicketArchive, CanceledTicketArchive
+from archive.archive import archive_tickets
+
+PAST = date(2024, 1, 5)
+FUTURE = date(2024, 3, 1)
+
+
+def test_archive_moves_past_tickets_with_their_cancellations(train, book, cancel):
+    past = book(train, PAST)
+    past_canceled = book(train, PAST)
+    # Cancellation rows may lack their own travel_date
+    cancel(past_canceled, travel_date=None)
+    future = book(train, FUTURE)
+    future_canceled = book(train, FUTURE)
+    cancel(future_canceled, travel_date=FUTURE)
+    db.session.commit()
+    past_ids = {past.ticket_id, past_canceled.ticket_id}
+    future_ids = {future.ticket_id, future_canceled.ticket_id}
+    canceled_id = past_canceled.ticket_id
+
+    archived = archive_tickets(retention_days=0, batch_size=1, today=date(2024, 2, 1))
+
+    assert archived == 2
+    assert {t.ticket_id for t in ReservedTicket.query} == future_ids
+    assert [t.ticket_id for t in CanceledTicket.query] == [future_canceled.ticket_id]
+    assert {t.ticket_id for t in ReservedTicketArchive.query} == past_ids
+    cold_cancellation = CanceledTicketArchive.query.one()
+    assert cold_cancellation.ticket_id == canceled_id
+    assert cold_cancellation.travel_date == PAST
+    assert cold_cancellation.archived_date is not None
+
+
+def test_archive_keeps_tickets_within_retention(train, book):
+    book(train, PAST)
+    db.session.commit()
+
+    assert archive_tickets(retention_days=30, today=date(2024, 1, 20)) == 0
+    assert ReservedTicket.query.count() == 1
+    assert ReservedTicketArchive.query.count() == 0
@@ -0,0 +1,99 @@
+from datetime import date
+from models import db, TrainStatus
+from seat_feed.seat_feed import SeatFeed, seat_feed, record_seat_change, seat_stream, live_seats_enabled
+
+TRAVEL_DATE = date(2024, 1, 5)
+OTHER_DATE = date(2024, 3, 1)
+
+
+def book_economy_seat(train_number, travel_date):
+    status = TrainStatus.query.filter_by(train_number=train_number, travel_date=travel_date).one()
+    status.booked_economy_seats += 1
+    record_seat_change(status, 'economy')
+
+
+def drain(subscription):
+    events = []
+    while True:
+        seat_event = subscription.get(timeout=0)
+        if seat_event is None:
+            return events
+        events.append(seat_event)
+
+
+def test_one_commit_reaches_every_subscriber(train):
+    subscriptions = [seat_feed.subscribe([(train, TRAVEL_DATE)]) for _ in range(5)]
+    other_date = seat_feed.subscribe([(train, OTHER_DATE)])
+    try:
+        book_economy_seat(train, TRAVEL_DATE)
+        assert all(drain(s) == [] for s in subscriptions)
+        db.session.commit()
+
+        expected = {
+            'train_number': train,
+            'travel_date': '2024-01-05',
+            'ticket_category': 'economy',
+            'available': 9,
+        }
+        assert [drain(s) for s in subscriptions] == [[expected]] * 5
+        assert drain(other_date) == []
+    finally:
+        for subscription in subscriptions + [other_date]:
+            subscription.close()
+
+
+def test_rollback_delivers_nothing(train):
+    subscriptions = [seat_feed.subscribe([(train, TRAVEL_DATE)]) for _ in range(5)]
+    try:
+        book_economy_seat(train, TRAVEL_DATE)
+        db.session.rollback()
+        db.session.commit()
+
+        assert all(drain(s) == [] for s in subscriptions)
+    finally:
+        for subscription in subscriptions:
+            subscription.close()
+
+
+def test_one_subscription_watches_several_dates(train):
+    subscription = seat_feed.subscribe([(train, TRAVEL_DATE), (train, OTHER_DATE)])
+    try:
+        book_economy_seat(train, TRAVEL_DATE)
+        book_economy_seat(train, OTHER_DATE)
+        db.session.commit()
+
+        assert [e['travel_date'] for e in drain(subscription)] == ['2024-01-05', '2024-03-01']
+    finally:
+        subscription.close()
+
+
+def test_closing_the_stream_unsubscribes(train):
+    subscription = seat_feed.subscribe([(train, TRAVEL_DATE), (train, OTHER_DATE)])
+    stream = seat_stream(subscription, [{'train_number': train, 'travel_date': '2024-01-05', 'seats': {}}])
+
+    assert next(stream).startswith('data: ')
+    stream.close()
+
+    assert seat_feed._subscribers == {}
+
+
+def test_streams_are_capped_per_process(train):
+    feed = SeatFeed(max_streams=2)
+    first = feed.subscribe([(train, TRAVEL_DATE)])
+    second = feed.subscribe([(train, TRAVEL_DATE)])
+
+    assert feed.subscribe([(train, TRAVEL_DATE)]) is None
+
+    first.close()
+    first.close()
+    third = feed.subscribe([(train, OTHER_DATE)])
+    assert third is not None
+    assert feed.subscribe([(train, OTHER_DATE)]) is None
+    second.close()
+    third.close()
+    assert feed._subscribers == {}
+
+
+def test_live_seats_need_a_gevent_worker():
+    # The test process is not monkey patched, like a sync worker
+    assert not live_seats_enabled()